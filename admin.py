@@ -1,18 +1,39 @@
 # admin.py
 """
 Frame: panel administrativo integrado.
-Permite ver chain.json, verificar integridad, corromper bloques y exportar.
+Permite ver chain.json, verificar integridad, corromper bloques, exportar
+y consultar la participación por hora.
 """
+import json
+import os
+import threading
 import tkinter as tk
 import ttkbootstrap as ttk
-from tkinter import messagebox, filedialog
+from tkinter import messagebox, filedialog, simpledialog
 from tkinter.scrolledtext import ScrolledText
+from collections import deque
 from datetime import datetime
 
+from blockchain import LectorCadena
+
+# Bloques que se muestran en "Mostrar Cadena" (los más recientes)
+BLOQUES_VISIBLES = 500
+# Líneas que conserva el log del panel (las más antiguas se descartan)
+LOG_MAX_LINEAS = 1000
+# Cada cuánto se vuelcan al widget las líneas pendientes del log
+LOG_INTERVALO_MS = 100
+# Errores de verificación que se muestran en el log; el resto solo va al reporte
+ERRORES_VISIBLES = 50
+
 class AdminFrame(ttk.Frame):
     def __init__(self, parent, controller):
         super().__init__(parent)
         self.controller = controller
+        # Líneas del log que aún no se dibujan; al ser acotada, una ráfaga de mensajes
+        # nunca genera más de LOG_MAX_LINEAS inserciones pendientes.
+        self._log_pendiente = deque(maxlen=LOG_MAX_LINEAS)
+        self._log_after = None
+        self._verificacion = None  # (hilo, estado) mientras se verifica la cadena
         self.build_ui()
 
     def build_ui(self):
@@ -24,9 +45,11 @@ class AdminFrame(ttk.Frame):
         btns = ttk.Frame(self)
         btns.pack(fill="x", pady=10)
         ttk.Button(btns, text="Mostrar Cadena", command=self.show_chain).pack(side="left", padx=6)
+        ttk.Button(btns, text="Ver bloque", command=self.ask_block).pack(side="left", padx=6)
         ttk.Button(btns, text="Verificar integridad", command=self.verify_chain).pack(side="left", padx=6)
         ttk.Button(btns, text="Corromper bloque", command=self.ask_corrupt).pack(side="left", padx=6)
         ttk.Button(btns, text="Exportar JSON", command=self.export_chain).pack(side="left", padx=6)
+        ttk.Button(btns, text="Participación", command=self.show_turnout).pack(side="left", padx=6)
 
         self.log = ScrolledText(self, height=20)
         self.log.pack(fill="both", expand=True, pady=8)
@@ -34,13 +57,37 @@ class AdminFrame(ttk.Frame):
 
     def log_insert(self, text):
         ts = datetime.utcnow().isoformat()
-        self.log.insert("end", f"{ts} - {text}\n")
+        self._log_pendiente.append(f"{ts} - {text}\n")
+        if self._log_after is None:
+            self._log_after = self.after(LOG_INTERVALO_MS, self._flush_log)
+
+    def _flush_log(self):
+        # Un solo insert y un solo see() por lote, y se recorta el widget al tope de líneas
+        self._log_after = None
+        if not self._log_pendiente:
+            return
+        self.log.insert("end", "".join(self._log_pendiente))
+        self._log_pendiente.clear()
+        lineas = int(self.log.index("end-1c").split(".")[0])
+        if lineas > LOG_MAX_LINEAS:
+            self.log.delete("1.0", f"{lineas - LOG_MAX_LINEAS + 1}.0")
         self.log.see("end")
 
+    def destroy(self):
+        if self._log_after is not None:
+            self.after_cancel(self._log_after)
+            self._log_after = None
+        self._verificacion = None
+        super().destroy()
+
     def show_chain(self):
+        # Solo se decodifican los últimos bloques; el archivo no se carga completo
         try:
-            with open(self.controller.bc.filename, "r", encoding="utf-8") as f:
-                content = f.read()
+            with LectorCadena(self.controller.bc.filename) as lector:
+                desde = max(0, len(lector) - BLOQUES_VISIBLES)
+                bloques = [b.to_dict() for b in lector.rango(desde, len(lector))]
+                content = f"Bloques {desde} a {len(lector) - 1} de {len(lector)}\n\n"
+                content += json.dumps(bloques, indent=4, ensure_ascii=False)
         except Exception:
             content = "No se pudo leer el archivo."
         win = tk.Toplevel(self)
@@ -49,15 +96,123 @@ class AdminFrame(ttk.Frame):
         txt.pack(fill="both", expand=True)
         txt.insert("end", content)
 
+    def ask_block(self):
+        bid = simpledialog.askinteger("Ver bloque", "ID bloque:", parent=self, minvalue=0)
+        if bid is None:
+            return
+        try:
+            with LectorCadena(self.controller.bc.filename) as lector:
+                bloque = lector[bid]
+        except IndexError:
+            messagebox.showerror("Error", f"No existe bloque {bid}.")
+            return
+        except Exception as e:
+            messagebox.showerror("Error", f"No se pudo leer el bloque: {e}")
+            return
+        win = tk.Toplevel(self)
+        win.title(f"Bloque {bid}")
+        txt = ScrolledText(win, height=12)
+        txt.pack(fill="both", expand=True)
+        txt.insert("end", json.dumps(bloque.to_dict(), indent=4, ensure_ascii=False))
+
     def verify_chain(self):
-        valido, errores = self.controller.bc.verificar_cadena()
-        if valido:
+        # La verificación corre en un hilo y escribe los errores al reporte a medida que
+        # aparecen; el hilo de Tk solo consulta el avance con after().
+        if self._verificacion is not None:
+            self.log_insert("Ya hay una verificación en curso.")
+            return
+        base = os.path.splitext(self.controller.bc.filename)[0]
+        estado = {
+            "ruta": f"{base}_verificacion_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.log",
+            "errores": 0,
+            "primeros": [],
+            "fallo_reporte": None,
+            "fallo": None,
+        }
+        hilo = threading.Thread(target=self._verificar_en_hilo, args=(estado,), daemon=True)
+        self._verificacion = (hilo, estado)
+        self.log_insert("Verificando la cadena...")
+        hilo.start()
+        self.after(LOG_INTERVALO_MS, self._revisar_verificacion)
+
+    def _verificar_en_hilo(self, estado):
+        # No toca widgets: solo la cadena, el archivo de reporte y el diccionario de estado
+        reporte = None
+        try:
+            for e in self.controller.bc.iterar_errores():
+                estado["errores"] += 1
+                if len(estado["primeros"]) < ERRORES_VISIBLES:
+                    estado["primeros"].append(e)
+                if reporte is None and estado["fallo_reporte"] is None:
+                    try:
+                        reporte = open(estado["ruta"], "w", encoding="utf-8")
+                    except OSError as exc:
+                        estado["fallo_reporte"] = exc
+                if reporte is not None:
+                    reporte.write(e + "\n")
+        except Exception as exc:
+            # Una auditoría que no terminó nunca debe reportarse como válida
+            estado["fallo"] = exc
+        finally:
+            if reporte is not None:
+                reporte.close()
+
+    def _revisar_verificacion(self):
+        if self._verificacion is None:  # el panel se cerró durante la verificación
+            return
+        hilo, estado = self._verificacion
+        if hilo.is_alive():
+            self.after(LOG_INTERVALO_MS, self._revisar_verificacion)
+            return
+        self._verificacion = None
+        total = estado["errores"]
+        if estado["fallo"] is not None:
+            self.log_insert(f"Verificación interrumpida tras {total} errores: {estado['fallo']}")
+            messagebox.showerror("Verificación", f"Verificación interrumpida: {estado['fallo']}")
+            return
+        if not total:
             messagebox.showinfo("Verificación", "La cadena es válida.")
             self.log_insert("Verificación: OK — cadena válida.")
+            return
+        for e in estado["primeros"]:
+            self.log_insert("ERROR: " + e)
+        if total > ERRORES_VISIBLES:
+            self.log_insert(f"... y {total - ERRORES_VISIBLES} errores más.")
+        if estado["fallo_reporte"] is not None:
+            self.log_insert(f"Verificación: {total} errores. No se pudo guardar el reporte completo.")
+            messagebox.showerror("Reporte", f"No se pudo crear {estado['ruta']}: {estado['fallo_reporte']}")
         else:
-            messagebox.showerror("Verificación", "Se detectaron alteraciones. Revisa el log.")
-            for e in errores:
-                self.log_insert("ERROR: " + e)
+            self.log_insert(f"Verificación: {total} errores. Reporte completo en {estado['ruta']}")
+        messagebox.showerror("Verificación", f"Se detectaron {total} alteraciones. Revisa el log.")
+
+    def show_turnout(self):
+        bc = self.controller.bc
+        por_hora = bc.votos_por_intervalo(60)
+        win = tk.Toplevel(self)
+        win.title("Participación por hora")
+        if not por_hora:
+            ttk.Label(win, text="Aún no hay votos registrados.").pack(padx=20, pady=20)
+            return
+
+        # Gráfica de barras: una barra por hora
+        ancho, alto, margen = 640, 300, 40
+        canvas = tk.Canvas(win, width=ancho, height=alto, bg="white")
+        canvas.pack(fill="both", expand=True, padx=8, pady=8)
+        maximo = max(n for _, n in por_hora) or 1
+        paso = (ancho - 2 * margen) / len(por_hora)
+        for i, (inicio, n) in enumerate(por_hora):
+            x0 = margen + i * paso
+            y0 = alto - margen - (alto - 2 * margen) * n / maximo
+            canvas.create_rectangle(x0 + 2, y0, x0 + paso - 2, alto - margen, fill="#519530", outline="")
+            canvas.create_text(x0 + paso / 2, y0 - 8, text=str(n))
+            canvas.create_text(x0 + paso / 2, alto - margen + 12, text=inicio[11:16])
+
+        totales = ttk.Frame(win)
+        totales.pack(fill="x", padx=8, pady=(0, 8))
+        ttk.Label(totales, text=f"Total: {bc.contar_votos()} votos", font=("Helvetica", 11, "bold")).pack(anchor="w")
+        for cand in bc.indice.candidatos():
+            ttk.Label(totales, text=f"{cand}: {bc.contar_votos(candidato=cand)}").pack(anchor="w")
+        self.log_insert("Consulta de participación por hora.")
 
     def ask_corrupt(self):
         top = tk.Toplevel(self)
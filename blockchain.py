@@ -1,10 +1,18 @@
+import codecs
 import hashlib
 import json
+import mmap
 import os
+import struct
+import threading
 from datetime import datetime
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Any, Tuple, Iterable, Iterator, Optional
+
+from indices import IndiceVotos
+from votos import mismo_estudiante
 
 CHAIN_FILE = "chain.json"
+TAM_LECTURA = 1 << 16
 
 
 class Block:
@@ -21,6 +29,8 @@ class Block:
     integridad de la cadena se rompe.
     """
     def __init__(self, id: int, timestamp: str, data: str, prev_hash: str, hash_actual: str = None):
+        self._canonico = None  # bytes que se hashean, calculados bajo demanda
+        self._digest = None    # hash recalculado a partir de _canonico
         self.id = id
         self.timestamp = timestamp
         self.data = data
@@ -28,6 +38,39 @@ class Block:
         # Si no se proporciona un hash, se calcula automáticamente.
         self.hash_actual = hash_actual if hash_actual is not None else self.calcular_hash()
 
+    def _campo(nombre: str) -> property:
+        """
+        Crea una propiedad para un campo que participa en el hash. Al asignarla se descartan
+        los bytes canónicos y el digest guardados, así que cualquier modificación del bloque
+        (incluida la de corromper_bloque) obliga a recalcular su hash.
+        """
+        privado = "_" + nombre
+
+        def get(self):
+            return getattr(self, privado)
+
+        def set(self, valor):
+            setattr(self, privado, valor)
+            self._canonico = None
+            self._digest = None
+
+        return property(get, set)
+
+    id = _campo("id")
+    timestamp = _campo("timestamp")
+    data = _campo("data")
+    prev_hash = _campo("prev_hash")
+    del _campo
+
+    def bytes_canonicos(self) -> bytes:
+        """
+        Devuelve la serialización canónica del bloque, es decir, los bytes sobre los que se
+        calcula el hash. Se construye una sola vez mientras el bloque no cambie.
+        """
+        if self._canonico is None:
+            self._canonico = f"{self._id}|{self._timestamp}|{self._data}|{self._prev_hash}".encode("utf-8")
+        return self._canonico
+
     def calcular_hash(self) -> str:
         """
         Este método calcula el hash criptográfico del bloque concatenando todos sus campos
@@ -36,9 +79,12 @@ class Block:
         manipulación o corrupción. El formato es:
 
         hash = SHA256( ID | timestamp | data | prev_hash )
+
+        El resultado se guarda y se reutiliza hasta que se modifique algún campo del bloque.
         """
-        contenido = f"{self.id}|{self.timestamp}|{self.data}|{self.prev_hash}"
-        return hashlib.sha256(contenido.encode("utf-8")).hexdigest()
+        if self._digest is None:
+            self._digest = hashlib.sha256(self.bytes_canonicos()).hexdigest()
+        return self._digest
 
     def to_dict(self) -> Dict[str, Any]:
         """
@@ -68,6 +114,211 @@ class Block:
         )
 
 
+def hashear_bloques(bloques: Iterable[Block]) -> List[str]:
+    """
+    Calcula los hashes de muchos bloques de una vez. Como calcular_hash reutiliza el digest
+    guardado, solo se hashean los bloques nuevos o modificados desde la última vez, por lo
+    que una auditoría repetida sobre la misma cadena prácticamente no vuelve a hashear nada.
+    """
+    return [b.calcular_hash() for b in bloques]
+
+
+def _iterar_objetos(filename: str, tam_lectura: int = TAM_LECTURA) -> Iterator[Tuple[int, int, Dict[str, Any]]]:
+    """
+    Recorre los objetos del arreglo JSON de un archivo de cadena sin cargarlo completo en
+    memoria. El archivo se lee por trozos y cada objeto se decodifica en cuanto está
+    completo, de modo que la memoria usada depende del tamaño de un bloque y no del de la
+    cadena. Para cada objeto devuelve (offset en bytes, longitud en bytes, diccionario).
+
+    Lanza ValueError si el archivo no tiene el formato de un arreglo JSON de bloques.
+    """
+    decoder = json.JSONDecoder()
+    utf8 = codecs.getincrementaldecoder("utf-8")()
+    buf = ""
+    pos = 0
+    offset = 0  # posición en bytes de buf[pos]
+    inicio = True
+    fin = False
+    with open(filename, "rb") as f:
+        while True:
+            trozo = f.read(tam_lectura)
+            buf = buf[pos:] + utf8.decode(trozo, final=not trozo)
+            pos = 0
+            while True:
+                # Saltar espacios y separadores entre objetos (todos ASCII: 1 byte)
+                while pos < len(buf) and buf[pos] in " \t\r\n,":
+                    pos += 1
+                    offset += 1
+                if pos >= len(buf):
+                    break
+                if inicio:
+                    if buf[pos] != "[":
+                        raise ValueError(f"{filename}: se esperaba '[' al inicio de la cadena")
+                    inicio = False
+                    pos += 1
+                    offset += 1
+                    continue
+                if buf[pos] == "]":
+                    fin = True
+                    break
+                try:
+                    obj, pos_fin = decoder.raw_decode(buf, pos)
+                except json.JSONDecodeError:
+                    if not trozo:
+                        raise ValueError(f"{filename}: bloque incompleto al final del archivo")
+                    # El objeto continúa en el siguiente trozo
+                    break
+                largo = len(buf[pos:pos_fin].encode("utf-8"))
+                yield offset, largo, obj
+                offset += largo
+                pos = pos_fin
+            if fin:
+                return
+            if not trozo:
+                raise ValueError(f"{filename}: falta ']' al final de la cadena")
+
+
+def iterar_bloques(filename: str, tam_lectura: int = TAM_LECTURA) -> Iterator[Block]:
+    """
+    Recorre los bloques de un archivo de cadena en streaming (ver _iterar_objetos).
+    Permite comparar o auditar cadenas de millones de bloques en memoria acotada.
+    """
+    for _, _, obj in _iterar_objetos(filename, tam_lectura):
+        try:
+            yield Block.from_dict(obj)
+        except (KeyError, TypeError):
+            raise ValueError(f"{filename}: objeto que no es un bloque válido")
+
+
+def _serializar(b: Block) -> bytes:
+    # Formato compacto con el que se escribe cada bloque en el archivo de la cadena
+    return json.dumps(b.to_dict(), separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def _posicion_cierre(f) -> Optional[int]:
+    """
+    Devuelve la posición en bytes del ']' que cierra el arreglo de la cadena, ignorando
+    los espacios y saltos de línea finales, o None si el archivo no termina en ']'.
+    """
+    f.seek(0, os.SEEK_END)
+    fin = f.tell()
+    cola = b""
+    while fin > 0:
+        inicio = max(0, fin - 64)
+        f.seek(inicio)
+        cola = f.read(fin - inicio).rstrip(b" \t\r\n")
+        if cola:
+            break
+        fin = inicio
+    if not cola.endswith(b"]"):
+        return None
+    return inicio + len(cola) - 1
+
+
+class IndiceOffsets:
+    """
+    Índice de ancho fijo que acompaña al archivo de la cadena (<cadena>.off). Guarda, para
+    cada bloque en orden, el offset y la longitud en bytes de su objeto JSON, de modo que
+    el bloque i se localiza leyendo un único registro en la posición CABECERA + i * REGISTRO.
+
+    La cabecera incluye el tamaño del archivo de la cadena; si no coincide con el archivo
+    real, o si el archivo no termina en ']', el índice se considera desactualizado.
+    """
+    CABECERA = struct.Struct("<8sQ")   # firma, tamaño del archivo de cadena
+    REGISTRO = struct.Struct("<QI")    # offset, longitud
+    FIRMA = b"CHAINOFF"
+
+    def __init__(self, filename: str):
+        self.filename = filename
+
+    def escribir(self, registros: Iterable[Tuple[int, int]], tam_cadena: int) -> None:
+        with open(self.filename, "wb") as f:
+            f.write(self.CABECERA.pack(self.FIRMA, tam_cadena))
+            for offset, largo in registros:
+                f.write(self.REGISTRO.pack(offset, largo))
+
+    def agregar(self, offset: int, largo: int, tam_cadena: int) -> None:
+        with open(self.filename, "r+b") as f:
+            f.seek(0, os.SEEK_END)
+            f.write(self.REGISTRO.pack(offset, largo))
+            f.seek(0)
+            f.write(self.CABECERA.pack(self.FIRMA, tam_cadena))
+
+    def reconstruir(self, archivo_cadena: str) -> None:
+        """
+        Vuelve a generar el índice recorriendo la cadena en streaming. Sirve para archivos
+        antiguos (por ejemplo, con sangría) o cuyo índice se perdió.
+        """
+        registros = [(offset, largo) for offset, largo, _ in _iterar_objetos(archivo_cadena)]
+        self.escribir(registros, os.path.getsize(archivo_cadena))
+
+    def vigente(self, archivo_cadena: str) -> bool:
+        try:
+            with open(self.filename, "rb") as f:
+                firma, tam = self.CABECERA.unpack(f.read(self.CABECERA.size))
+            if (firma != self.FIRMA or tam != os.path.getsize(archivo_cadena)
+                    or (os.path.getsize(self.filename) - self.CABECERA.size) % self.REGISTRO.size):
+                return False
+            with open(archivo_cadena, "rb") as f:
+                return _posicion_cierre(f) is not None
+        except (OSError, struct.error):
+            return False
+
+
+class LectorCadena:
+    """
+    La clase LectorCadena da acceso aleatorio de solo lectura a los bloques de un archivo
+    de cadena sin cargarlo. Mapea en memoria el archivo y su índice de offsets y decodifica
+    únicamente los bloques solicitados, así que abrir una cadena de millones de bloques es
+    casi instantáneo y la memoria residente depende de lo que se consulte.
+
+    Se comporta como una secuencia: len(lector), lector[i] y lector.rango(desde, hasta).
+    Como los IDs son consecutivos desde el génesis, la posición de un bloque es su ID.
+    """
+
+    def __init__(self, filename: str = CHAIN_FILE, reconstruir: bool = True):
+        self.filename = filename
+        self.offsets = IndiceOffsets(filename + ".off")
+        if not self.offsets.vigente(filename):
+            if not reconstruir:
+                raise ValueError(f"{filename}: índice de offsets ausente o desactualizado")
+            self.offsets.reconstruir(filename)
+        self._f = open(filename, "rb")
+        self._fi = open(self.offsets.filename, "rb")
+        self._datos = mmap.mmap(self._f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._indice = mmap.mmap(self._fi.fileno(), 0, access=mmap.ACCESS_READ)
+        self._n = (len(self._indice) - IndiceOffsets.CABECERA.size) // IndiceOffsets.REGISTRO.size
+
+    def __len__(self) -> int:
+        return self._n
+
+    def __getitem__(self, i: int) -> Block:
+        if i < 0:
+            i += self._n
+        if not 0 <= i < self._n:
+            raise IndexError(f"No existe bloque {i}")
+        offset, largo = IndiceOffsets.REGISTRO.unpack_from(
+            self._indice, IndiceOffsets.CABECERA.size + i * IndiceOffsets.REGISTRO.size)
+        return Block.from_dict(json.loads(self._datos[offset:offset + largo]))
+
+    def rango(self, desde: int, hasta: int) -> Iterator[Block]:
+        """Devuelve los bloques con ID en [desde, hasta)."""
+        for i in range(max(desde, 0), min(hasta, self._n)):
+            yield self[i]
+
+    def cerrar(self) -> None:
+        self._datos.close()
+        self._indice.close()
+        self._f.close()
+        self._fi.close()
+
+    def __enter__(self) -> "LectorCadena":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.cerrar()
+
+
 class Blockchain:
     """
     La clase Blockchain administra toda la cadena. Se encarga de:
@@ -76,7 +327,8 @@ class Blockchain:
     - agregar nuevos bloques,
     - verificar la integridad de la cadena completa,
     - simular corrupción en un bloque,
-    - exportar la cadena a un archivo JSON.
+    - exportar la cadena a un archivo JSON,
+    - responder consultas por rango de tiempo y por candidato mediante índices.
 
     Funciona como una "base de datos encadenada", donde cada elemento depende criptográficamente
     del anterior.
@@ -85,7 +337,11 @@ class Blockchain:
     def __init__(self, filename: str = CHAIN_FILE):
         self.filename = filename
         self.chain: List[Block] = []
+        self.indice = IndiceVotos(filename + ".idx")
+        self.offsets = IndiceOffsets(filename + ".off")
+        self._lock = threading.Lock()  # serializa los agregados sobre la punta de la cadena
         self._load_or_create()  # Cargar archivo o crear bloque génesis
+        self.indice.sincronizar(self.chain)
 
     def _load_or_create(self) -> None:
         """
@@ -123,10 +379,46 @@ class Blockchain:
         """
         Guarda toda la cadena en el archivo JSON especificado. Se utiliza cada vez que se añade
         un nuevo bloque o se modifica el contenido. Esta función garantiza la persistencia
-        de la cadena entre ejecuciones.
+        de la cadena entre ejecuciones. Se escribe sin sangría para que el archivo sea
+        compacto y rápido de cargar; export_json genera la versión legible. Junto con la
+        cadena se reescribe su índice de offsets (ver LectorCadena).
         """
-        with open(self.filename, "w", encoding="utf-8") as f:
-            json.dump([b.to_dict() for b in self.chain], f, indent=4, ensure_ascii=False)
+        registros = []
+        with open(self.filename, "wb") as f:
+            f.write(b"[")
+            for i, b in enumerate(self.chain):
+                if i:
+                    f.write(b",")
+                blob = _serializar(b)
+                registros.append((f.tell(), len(blob)))
+                f.write(blob)
+            f.write(b"]")
+            tam = f.tell()
+        self.offsets.escribir(registros, tam)
+
+    def _anexar(self, b: Block) -> None:
+        """
+        Persiste un bloque nuevo agregándolo al final del archivo (sobre el ']' de cierre)
+        en lugar de reescribir toda la cadena, y registra su offset en el índice. Si el
+        índice no corresponde con el archivo o no se encuentra el ']' final (por ejemplo,
+        en un archivo editado a mano), se recurre a _save.
+        """
+        if not self.offsets.vigente(self.filename):
+            self._save()
+            return
+        blob = _serializar(b)
+        with open(self.filename, "r+b") as f:
+            cierre = _posicion_cierre(f)
+            if cierre is not None:
+                # Se escribe sobre el ']' y se descartan los espacios finales que hubiera
+                f.seek(cierre)
+                f.write(b"," + blob + b"]")
+                tam = f.tell()
+                f.truncate()
+        if cierre is None:
+            self._save()
+            return
+        self.offsets.agregar(cierre + 1, len(blob), tam)
 
     def agregar_bloque(self, data: str) -> Block:
         """
@@ -139,16 +431,38 @@ class Blockchain:
         - lo almacena y lo guarda en disco.
 
         Este método es esencial, pues simula la creación de transacciones o registros dentro
-        de la mini-blockchain.
+        de la mini-blockchain. Es seguro llamarlo desde varios hilos: los agregados se
+        serializan para que dos bloques nunca compartan el mismo prev_hash.
         """
-        ultimo = self.chain[-1]
-        nuevo_id = ultimo.id + 1
-        ts = datetime.utcnow().isoformat()
-        nuevo = Block(id=nuevo_id, timestamp=ts, data=data, prev_hash=ultimo.hash_actual)
-        self.chain.append(nuevo)
-        self._save()
+        with self._lock:
+            ultimo = self.chain[-1]
+            nuevo_id = ultimo.id + 1
+            ts = datetime.utcnow().isoformat()
+            nuevo = Block(id=nuevo_id, timestamp=ts, data=data, prev_hash=ultimo.hash_actual)
+            self.chain.append(nuevo)
+            self._anexar(nuevo)
+            self.indice.agregar(nuevo)
         return nuevo
 
+    def cabeza(self) -> Block:
+        """
+        Devuelve el último bloque de la cadena. Espera a que termine cualquier agregado en
+        curso, de modo que el bloque devuelto ya está guardado en disco.
+        """
+        with self._lock:
+            return self.chain[-1]
+
+    def ya_voto(self, estudiante_id: str) -> bool:
+        """
+        Indica si el estudiante ya tiene un voto registrado en la cadena. Cada bloque se
+        descarta primero con una búsqueda de subcadena (ver votos.mismo_estudiante), así que
+        la mayoría de los bloques no llegan a decodificarse.
+        """
+        for b in self.chain:
+            if mismo_estudiante(b.data, estudiante_id):
+                return True
+        return False
+
     def verificar_cadena(self) -> Tuple[bool, List[str]]:
         """
         Verifica la integridad de toda la cadena. Para hacerlo recorre cada bloque y realiza
@@ -160,22 +474,29 @@ class Blockchain:
         Si cualquiera de estas condiciones falla, la cadena ha sido alterada. El método devuelve:
         - un booleano indicando si la cadena es válida,
         - una lista de textos describiendo los errores detectados.
-        """
-        errores = []
-        valido = True
-        for i, b in enumerate(self.chain):
-            recalculado = b.calcular_hash()
-            if recalculado != b.hash_actual:
-                errores.append(f"Bloque {b.id}: hash_actual inválido (recalculado {recalculado} != {b.hash_actual})")
-                valido = False
 
-            if i > 0:
-                prev = self.chain[i - 1]
-                if b.prev_hash != prev.hash_actual:
-                    errores.append(f"Bloque {b.id}: prev_hash ({b.prev_hash}) != hash_actual anterior ({prev.hash_actual})")
-                    valido = False
+        Para cadenas con muchos errores conviene iterar_errores, que no acumula la lista.
+        """
+        errores = list(self.iterar_errores())
+        return not errores, errores
 
-        return valido, errores
+    def iterar_errores(self) -> Iterator[str]:
+        """
+        Realiza las mismas comprobaciones que verificar_cadena, pero devuelve cada error en
+        cuanto lo encuentra, de modo que quien lo consume puede escribirlo a un archivo sin
+        guardar todos en memoria. Los hashes de la copia de la cadena se recalculan en una sola
+        pasada con hashear_bloques, que solo vuelve a hashear los bloques modificados desde la
+        verificación anterior.
+        """
+        # Una sola copia de la lista: otros hilos pueden agregar bloques mientras se verifica
+        bloques = list(self.chain)
+        prev = None
+        for b, recalculado in zip(bloques, hashear_bloques(bloques)):
+            if recalculado != b.hash_actual:
+                yield f"Bloque {b.id}: hash_actual inválido (recalculado {recalculado} != {b.hash_actual})"
+            if prev is not None and b.prev_hash != prev.hash_actual:
+                yield f"Bloque {b.id}: prev_hash ({b.prev_hash}) != hash_actual anterior ({prev.hash_actual})"
+            prev = b
 
     def corromper_bloque(self, id: int, nuevo_data: str) -> bool:
         """
@@ -183,13 +504,41 @@ class Blockchain:
         el hash del bloque, por lo que rompe la cadena y permite simular un ataque o manipulación.
         El método devuelve True si la corrupción se realizó correctamente.
         """
-        for b in self.chain:
-            if b.id == id:
-                b.data = nuevo_data
-                self._save()
-                return True
+        with self._lock:
+            for b in self.chain:
+                if b.id == id:
+                    b.data = nuevo_data
+                    self._save()
+                    self.indice.reconstruir(self.chain)
+                    return True
         return False
 
+    def contar_votos(self, desde: Optional[str] = None, hasta: Optional[str] = None,
+                     candidato: Optional[str] = None) -> int:
+        """
+        Cuenta los votos emitidos en el intervalo [desde, hasta), opcionalmente solo los de
+        un candidato. Los límites son timestamps ISO (por ejemplo "2025-03-01T10:00") y
+        cualquiera puede omitirse. Usa el índice, por lo que no recorre la cadena.
+        """
+        return self.indice.contar(desde, hasta, candidato)
+
+    def votos_en_rango(self, desde: Optional[str] = None, hasta: Optional[str] = None,
+                       candidato: Optional[str] = None) -> List[Block]:
+        """
+        Devuelve los bloques de voto del intervalo [desde, hasta), ordenados por timestamp,
+        opcionalmente filtrados por candidato.
+        """
+        return [self.chain[i] for i in self.indice.ids_en_rango(desde, hasta, candidato)]
+
+    def votos_por_intervalo(self, minutos: int = 60,
+                            candidato: Optional[str] = None) -> List[Tuple[str, int]]:
+        """
+        Devuelve la participación agrupada en intervalos de `minutos` como una lista de
+        (inicio del intervalo, número de votos). Se usa para las gráficas del panel.
+        Lanza ValueError si `minutos` es menor que 1.
+        """
+        return self.indice.por_intervalo(minutos, candidato)
+
     def export_json(self, out_file: str) -> None:
         """
         Exporta toda la cadena a un archivo JSON externo, permitiendo análisis, respaldo
@@ -6,29 +6,8 @@ import customtkinter as ctk
 from tkinter import messagebox
 from PIL import Image
 import os
-import json
-
-# Datos de candidatos 
-CANDIDATOS_DATA = [
-    {
-        "id": "cand_1",
-        "nombre": "Paquita la del Barrio",
-        "desc": "Propuesta centrada en la mejora tecnológica de las aulas y laboratorios, con enfoque en sostenibilidad ambiental dentro del campus.",
-        "img_file": "candidato_1.jpeg"
-    },
-    {
-        "id": "cand_2",
-        "nombre": "Vicente Fernández",
-        "desc": "Fomento a la cultura, el deporte y la integración de todas las carreras. Más becas y apoyos alimenticios para estudiantes.",
-        "img_file": "candidato_2.jpeg"
-    },
-    {
-        "id": "cand_3",
-        "nombre": "El Buki",
-        "desc": "Auditoría constante de recursos, creación de espacios de descanso y mejora en el sistema de transporte universitario.",
-        "img_file": "candidato_3.jpeg"
-    }
-]
+
+from votos import CANDIDATOS_DATA, NOMBRE_POR_ID, codificar_voto
 
 class CandidatosFrame(ctk.CTkFrame):
     def __init__(self, parent, controller):
@@ -145,7 +124,7 @@ class CandidatosFrame(ctk.CTkFrame):
             text="Votar",
             font=ctk.CTkFont(weight="bold"),
             variable=self.seleccion_var,
-            value=data["nombre"],
+            value=data["id"],
             fg_color=self.colors["azul"],
             hover_color=self.colors["verde"],
             border_color=self.colors["azul"],
@@ -171,7 +150,7 @@ class CandidatosFrame(ctk.CTkFrame):
             messagebox.showwarning("Atención", "Por favor selecciona un candidato.")
             return
 
-        confirm = messagebox.askyesno("Confirmar", f"¿Votar por: {seleccionado}?")
+        confirm = messagebox.askyesno("Confirmar", f"¿Votar por: {NOMBRE_POR_ID[seleccionado]}?")
         if not confirm:
             return
 
@@ -179,18 +158,16 @@ class CandidatosFrame(ctk.CTkFrame):
         self.btn_votar.configure(state="disabled", text="Procesando...") 
         self.update()
 
-        payload = {
-            "estudiante_nombre": self.controller.shared_data.get("nombre"),
-            "estudiante_apellido": self.controller.shared_data.get("apellido"),
-            "estudiante_id": self.controller.shared_data.get("id_estudiante"),
-            "candidato": seleccionado
-        }
-        
         try:
-            payload_json = json.dumps(payload, ensure_ascii=False)
+            payload = codificar_voto(
+                candidato_id=seleccionado,
+                estudiante_id=self.controller.shared_data.get("id_estudiante"),
+                nombre=self.controller.shared_data.get("nombre"),
+                apellido=self.controller.shared_data.get("apellido")
+            )
             
             # Registrar bloque (sin acceder a atributos que causen error)
-            self.controller.bc.agregar_bloque(payload_json)
+            self.controller.bc.agregar_bloque(payload)
             
             messagebox.showinfo("Éxito", "Voto registrado correctamente en la Blockchain.")
             
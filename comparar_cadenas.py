@@ -0,0 +1,190 @@
+"""
+Herramienta: comparación de cadenas entre kioscos.
+Encuentra el prefijo común y la primera divergencia entre dos archivos chain.json
+y reporta los bloques que solo existen en cada lado, sin cargar las cadenas completas.
+
+Uso:
+    python comparar_cadenas.py kiosco_a/chain.json kiosco_b/chain.json [--detalle] [--indice]
+"""
+import argparse
+import sys
+from itertools import islice
+from typing import Any, Dict, Iterator, Sequence
+
+from blockchain import Block, Blockchain, LectorCadena, iterar_bloques
+
+
+def primera_divergencia(bloques_a: Sequence[Block], bloques_b: Sequence[Block]) -> int:
+    """
+    Busca con búsqueda binaria la primera posición en la que los hashes de ambas cadenas
+    difieren. Funciona porque cada hash depende del prev_hash: si dos bloques en la misma
+    posición tienen el mismo hash, todo lo anterior también coincide. Por eso solo es
+    confiable cuando ambas cadenas son íntegras (ver Blockchain.verificar_cadena).
+
+    Devuelve la longitud del prefijo común.
+    """
+    lo, hi = 0, min(len(bloques_a), len(bloques_b))
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if bloques_a[mid].hash_actual == bloques_b[mid].hash_actual:
+            lo = mid + 1
+        else:
+            hi = mid
+    return lo
+
+
+def _reporte(total_a: int, total_b: int, prefijo: int, modo: str) -> Dict[str, Any]:
+    """
+    Arma el reporte de diferencias. Como los IDs de bloque son consecutivos desde el
+    génesis, los bloques exclusivos de cada lado son el rango [prefijo, total).
+    """
+    return {
+        "total_a": total_a,
+        "total_b": total_b,
+        "prefijo_comun": prefijo,
+        # None cuando una cadena es prefijo de la otra (no hay bloque en conflicto)
+        "divergencia": prefijo if prefijo < min(total_a, total_b) else None,
+        "solo_a": total_a - prefijo,
+        "solo_b": total_b - prefijo,
+        "modo": modo,
+    }
+
+
+def comparar_blockchains(a: Blockchain, b: Blockchain) -> Dict[str, Any]:
+    """
+    Compara dos cadenas ya cargadas en memoria usando búsqueda binaria sobre los hashes.
+    """
+    prefijo = primera_divergencia(a.chain, b.chain)
+    return _reporte(len(a.chain), len(b.chain), prefijo, "memoria")
+
+
+class _LecturaVerificada:
+    """
+    Envuelve un LectorCadena para la búsqueda binaria: cada bloque leído se comprueba
+    recalculando su hash y contra el hash_actual del bloque anterior. Si alguno no cuadra,
+    lanza ValueError, porque la búsqueda binaria solo es válida sobre cadenas íntegras.
+    """
+
+    def __init__(self, lector: LectorCadena):
+        self.lector = lector
+
+    def __len__(self) -> int:
+        return len(self.lector)
+
+    def __getitem__(self, i: int) -> Block:
+        b = self.lector[i]
+        if b.calcular_hash() != b.hash_actual:
+            raise ValueError(f"{self.lector.filename}: bloque {i} alterado")
+        if i > 0 and self.lector[i - 1].hash_actual != b.prev_hash:
+            raise ValueError(f"{self.lector.filename}: bloque {i} no enlaza con el anterior")
+        return b
+
+
+def comparar_indexados(archivo_a: str, archivo_b: str) -> Dict[str, Any]:
+    """
+    Compara dos archivos que tienen su índice de offsets vigente. Con acceso aleatorio
+    la divergencia se encuentra con búsqueda binaria sobre los hashes, leyendo solo
+    O(log n) bloques de cada archivo; cada bloque leído se verifica (_LecturaVerificada).
+    Lanza ValueError si falta algún índice o algún bloque leído está alterado. Los bloques
+    que la búsqueda no lee no se verifican, así que tras un incidente conviene el modo completo.
+    """
+    with LectorCadena(archivo_a, reconstruir=False) as a, LectorCadena(archivo_b, reconstruir=False) as b:
+        prefijo = primera_divergencia(_LecturaVerificada(a), _LecturaVerificada(b))
+        return _reporte(len(a), len(b), prefijo, "indice")
+
+
+def comparar_archivos(archivo_a: str, archivo_b: str, usar_indice: bool = False) -> Dict[str, Any]:
+    """
+    Compara dos archivos de cadena leyéndolos en paralelo, bloque por bloque, sin cargarlos
+    completos. Se comparan todos los campos (no solo el hash), de modo que también se detecta
+    un bloque alterado que conserva su hash_actual original. Tras la divergencia solo se
+    cuentan los bloques restantes.
+
+    Con usar_indice=True se intenta primero comparar_indexados; si falta un índice o alguno
+    de los bloques que lee la búsqueda está alterado, se vuelve a la comparación completa.
+    Las alteraciones en bloques que la búsqueda no lee pasan inadvertidas en ese modo. El
+    campo "modo" del reporte indica cuál se usó.
+    """
+    if usar_indice:
+        try:
+            return comparar_indexados(archivo_a, archivo_b)
+        except ValueError:
+            pass
+
+    it_a = iterar_bloques(archivo_a)
+    it_b = iterar_bloques(archivo_b)
+    prefijo = 0
+    pendientes_a = pendientes_b = 0
+    for blk_a in it_a:
+        blk_b = next(it_b, None)
+        if blk_b is None:
+            pendientes_a = 1
+            break
+        if blk_a.to_dict() != blk_b.to_dict():
+            pendientes_a = pendientes_b = 1
+            break
+        prefijo += 1
+    total_a = prefijo + pendientes_a + sum(1 for _ in it_a)
+    total_b = prefijo + pendientes_b + sum(1 for _ in it_b)
+    return _reporte(total_a, total_b, prefijo, "completo")
+
+
+def bloques_unicos(filename: str, prefijo: int) -> Iterator[Block]:
+    """
+    Devuelve, en streaming, los bloques de un archivo posteriores al prefijo común.
+    Si el archivo tiene índice de offsets, se salta directamente al primero.
+    """
+    try:
+        lector = LectorCadena(filename, reconstruir=False)
+    except ValueError:
+        yield from islice(iterar_bloques(filename), prefijo, None)
+        return
+    with lector:
+        yield from lector.rango(prefijo, len(lector))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compara dos archivos chain.json.")
+    parser.add_argument("archivo_a")
+    parser.add_argument("archivo_b")
+    parser.add_argument("--detalle", action="store_true",
+                        help="imprime los bloques exclusivos de cada lado")
+    parser.add_argument("--indice", action="store_true",
+                        help="usa búsqueda binaria sobre los índices de offsets (solo para cadenas íntegras)")
+    args = parser.parse_args()
+
+    try:
+        rep = comparar_archivos(args.archivo_a, args.archivo_b, usar_indice=args.indice)
+    except (OSError, ValueError) as e:
+        sys.exit(f"Error: no se pudieron comparar las cadenas: {e}")
+    if rep["modo"] == "indice":
+        print("Modo: búsqueda binaria sobre los índices")
+        print("Aviso: solo se verificaron los bloques que leyó la búsqueda; una alteración en otros "
+              "bloques del prefijo no se detecta. Usa el modo completo tras un incidente.")
+    else:
+        if args.indice:
+            print("Aviso: índice ausente o bloque alterado; se usó la comparación completa")
+        print("Modo: comparación completa, campo por campo")
+    print(f"A: {args.archivo_a} ({rep['total_a']} bloques)")
+    print(f"B: {args.archivo_b} ({rep['total_b']} bloques)")
+    print(f"Prefijo común: {rep['prefijo_comun']} bloques")
+    if rep["divergencia"] is not None:
+        print(f"Primera divergencia en el bloque {rep['divergencia']}")
+    elif rep["solo_a"] or rep["solo_b"]:
+        print("Sin conflictos: una cadena es prefijo de la otra")
+    else:
+        print("Las cadenas son idénticas")
+    print(f"Bloques solo en A: {rep['solo_a']}")
+    print(f"Bloques solo en B: {rep['solo_b']}")
+
+    if args.detalle:
+        for etiqueta, archivo in (("A", args.archivo_a), ("B", args.archivo_b)):
+            try:
+                for blk in bloques_unicos(archivo, rep["prefijo_comun"]):
+                    print(f"[{etiqueta}] {blk.id} {blk.timestamp} {blk.hash_actual} {blk.data}")
+            except (OSError, ValueError) as e:
+                sys.exit(f"Error: no se pudo leer {archivo}: {e}")
+
+
+if __name__ == "__main__":
+    main()
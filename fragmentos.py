@@ -0,0 +1,172 @@
+"""
+Cadenas fragmentadas por casilla (estación de votación).
+
+Cada estación escribe en su propia Blockchain (chain_<estación>.json), con su propia punta,
+de modo que las estaciones agregan votos en paralelo. Una cadena raíz (chain_raiz.json)
+recibe periódicamente bloques ancla que registran la cabeza (ID y hash) de cada fragmento;
+así la elección completa sigue siendo auditable: alterar un fragmento después de anclado
+rompe la correspondencia con la raíz.
+"""
+import json
+import os
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from blockchain import Block, Blockchain
+from votos import estudiante_id_de
+
+ARCHIVO_RAIZ = "chain_raiz.json"
+TIPO_ANCLA = "ancla"
+
+
+class BlockchainFragmentada:
+    """
+    La clase BlockchainFragmentada agrupa un fragmento (Blockchain) por estación y una cadena
+    raíz de anclas. Se encarga de:
+    - registrar votos en el fragmento de cada estación,
+    - impedir que un estudiante vote en más de una estación,
+    - anclar las cabezas de los fragmentos en la raíz cada `anclar_cada` votos,
+    - contar votos y verificar la integridad de todos los fragmentos y de la raíz.
+    """
+
+    def __init__(self, estaciones: List[str], directorio: str = ".", anclar_cada: int = 100):
+        if not estaciones:
+            raise ValueError("Se requiere al menos una estación.")
+        self.directorio = directorio
+        self.anclar_cada = anclar_cada
+        self.fragmentos: Dict[str, Blockchain] = {
+            est: Blockchain(os.path.join(directorio, f"chain_{est}.json")) for est in estaciones
+        }
+        self.raiz = Blockchain(os.path.join(directorio, ARCHIVO_RAIZ))
+
+        # Registro global de votantes: hace atómica la verificación de duplicados entre
+        # estaciones sin serializar los agregados de los fragmentos.
+        self._lock_votantes = threading.Lock()
+        self._votantes = set()
+        for frag in self.fragmentos.values():
+            for b in frag.chain:
+                est_id = estudiante_id_de(b.data)
+                if est_id is not None:
+                    self._votantes.add(est_id)
+
+        self._lock_anclas = threading.Lock()
+        self._sin_anclar = 0
+
+    def ya_voto(self, estudiante_id: str) -> bool:
+        """Indica si el estudiante ya votó en cualquiera de las estaciones."""
+        return estudiante_id in self._votantes
+
+    def registrar_voto(self, estacion: str, data: str) -> Block:
+        """
+        Agrega un voto al fragmento de la estación. La verificación de duplicados y la reserva
+        del estudiante se hacen bajo un mismo candado, así que dos estaciones no pueden
+        aceptar al mismo estudiante a la vez. Lanza KeyError si la estación no existe y
+        ValueError si el estudiante ya votó.
+        """
+        frag = self.fragmentos[estacion]
+        est_id = estudiante_id_de(data)
+        if est_id is not None:
+            with self._lock_votantes:
+                if est_id in self._votantes:
+                    raise ValueError(f"El código {est_id} ya ha registrado un voto.")
+                self._votantes.add(est_id)
+        try:
+            bloque = frag.agregar_bloque(data)
+        except Exception:
+            if est_id is not None:
+                with self._lock_votantes:
+                    self._votantes.discard(est_id)
+            raise
+
+        # Decidir y reiniciar el contador en la misma sección crítica: así exactamente un
+        # hilo ancla cada `anclar_cada` votos.
+        with self._lock_anclas:
+            self._sin_anclar += 1
+            anclar = bool(self.anclar_cada) and self._sin_anclar >= self.anclar_cada
+            if anclar:
+                self._sin_anclar = 0
+        if anclar:
+            self._escribir_ancla()
+        return bloque
+
+    def anclar(self) -> Block:
+        """
+        Agrega a la cadena raíz un bloque ancla con la cabeza actual (ID y hash) de cada
+        fragmento. Se llama automáticamente cada `anclar_cada` votos y puede llamarse a mano,
+        por ejemplo al cerrar la votación.
+        """
+        with self._lock_anclas:
+            self._sin_anclar = 0
+        return self._escribir_ancla()
+
+    def _escribir_ancla(self) -> Block:
+        # Fuera de _lock_anclas: leer las cabezas y escribir en la raíz no debe detener
+        # a las estaciones. La raíz serializa sus propios agregados.
+        cabezas = {}
+        for est, frag in sorted(self.fragmentos.items()):
+            cab = frag.cabeza()
+            cabezas[est] = [cab.id, cab.hash_actual]
+        data = json.dumps({"tipo": TIPO_ANCLA, "cabezas": cabezas},
+                          sort_keys=True, separators=(",", ":"))
+        return self.raiz.agregar_bloque(data)
+
+    def contar_votos(self, desde: Optional[str] = None, hasta: Optional[str] = None,
+                     candidato: Optional[str] = None) -> int:
+        """Suma Blockchain.contar_votos de todos los fragmentos."""
+        return sum(frag.contar_votos(desde, hasta, candidato) for frag in self.fragmentos.values())
+
+    def conteo(self) -> Dict[str, int]:
+        """Devuelve el total de votos por candidato sumando todas las estaciones."""
+        totales: Dict[str, int] = {}
+        for frag in self.fragmentos.values():
+            for cand in frag.indice.candidatos():
+                totales[cand] = totales.get(cand, 0) + frag.contar_votos(candidato=cand)
+        return totales
+
+    def verificar(self) -> Tuple[bool, List[str]]:
+        """
+        Verifica toda la elección:
+        1. Cada fragmento y la raíz con Blockchain.verificar_cadena.
+        2. Que cada ancla de la raíz coincida con el bloque que registró en cada fragmento.
+        3. Que ningún estudiante aparezca en más de un voto entre todas las estaciones.
+
+        Devuelve, igual que verificar_cadena, (válido, lista de errores).
+        """
+        errores = []
+        for est, frag in sorted(self.fragmentos.items()):
+            _, errs = frag.verificar_cadena()
+            errores.extend(f"[{est}] {e}" for e in errs)
+        _, errs = self.raiz.verificar_cadena()
+        errores.extend(f"[raíz] {e}" for e in errs)
+
+        for b in self.raiz.chain:
+            try:
+                ancla = json.loads(b.data)
+            except Exception:
+                continue
+            if not isinstance(ancla, dict) or ancla.get("tipo") != TIPO_ANCLA:
+                continue
+            cabezas = ancla.get("cabezas")
+            if not isinstance(cabezas, dict) or not all(
+                    isinstance(c, list) and len(c) == 2 and isinstance(c[0], int)
+                    and c[0] >= 0 and isinstance(c[1], str) for c in cabezas.values()):
+                errores.append(f"[raíz] Ancla {b.id}: formato inválido")
+                continue
+            for est, (bid, h) in cabezas.items():
+                frag = self.fragmentos.get(est)
+                if frag is None:
+                    errores.append(f"[raíz] Ancla {b.id}: estación desconocida {est}")
+                elif bid >= len(frag.chain) or frag.chain[bid].hash_actual != h:
+                    errores.append(f"[raíz] Ancla {b.id}: el bloque {bid} de {est} no coincide con el anclado")
+
+        vistos: Dict[str, str] = {}
+        for est, frag in sorted(self.fragmentos.items()):
+            for b in frag.chain:
+                est_id = estudiante_id_de(b.data)
+                if est_id is None:
+                    continue
+                if est_id in vistos:
+                    errores.append(f"[{est}] Bloque {b.id}: el código {est_id} ya votó en {vistos[est_id]}")
+                else:
+                    vistos[est_id] = est
+        return not errores, errores
@@ -0,0 +1,161 @@
+"""
+Índices secundarios de la blockchain para consultas analíticas.
+Mantiene los votos ordenados por timestamp, en total y por candidato, para responder
+consultas de rango y conteo con búsqueda binaria en lugar de recorrer la cadena.
+"""
+import json
+from bisect import bisect_left
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from votos import candidato_de
+
+
+class IndiceVotos:
+    """
+    La clase IndiceVotos guarda, para cada voto, su timestamp y su ID de bloque en listas
+    ordenadas por timestamp. Existe una lista global y una por candidato, de modo que
+    contar o listar los votos de un intervalo cuesta O(log n).
+
+    El índice se persiste en un archivo JSONL junto a la cadena (una línea por voto:
+    [id, timestamp, candidato, hash]) al que solo se le agregan líneas, así que mantenerlo
+    al agregar un bloque no obliga a reescribirlo. El hash del último voto indexado permite
+    detectar que el archivo pertenece a otra cadena.
+    """
+
+    def __init__(self, filename: str):
+        self.filename = filename
+        self._limpiar()
+
+    def _limpiar(self) -> None:
+        self.timestamps: List[str] = []
+        self.ids: List[int] = []
+        self.ts_candidato: Dict[str, List[str]] = {}
+        self.ids_candidato: Dict[str, List[int]] = {}
+        self.ultimo_id = -1
+
+    def _insertar(self, id: int, timestamp: str, candidato: str) -> None:
+        """
+        Inserta un voto conservando el orden por timestamp. Lo normal es que los votos
+        lleguen en orden, por lo que casi siempre es un append.
+        """
+        for ts_lista, id_lista in ((self.timestamps, self.ids),
+                                   (self.ts_candidato.setdefault(candidato, []),
+                                    self.ids_candidato.setdefault(candidato, []))):
+            if not ts_lista or ts_lista[-1] <= timestamp:
+                ts_lista.append(timestamp)
+                id_lista.append(id)
+            else:
+                pos = bisect_left(ts_lista, timestamp)
+                ts_lista.insert(pos, timestamp)
+                id_lista.insert(pos, id)
+        self.ultimo_id = max(self.ultimo_id, id)
+
+    def agregar(self, bloque) -> None:
+        """
+        Indexa un bloque recién agregado a la cadena y lo persiste en el archivo.
+        Los bloques que no son votos solo avanzan el último ID indexado.
+        """
+        candidato = candidato_de(bloque.data)
+        if candidato is None:
+            self.ultimo_id = max(self.ultimo_id, bloque.id)
+            return
+        self._insertar(bloque.id, bloque.timestamp, candidato)
+        with open(self.filename, "a", encoding="utf-8") as f:
+            f.write(self._linea(bloque, candidato))
+
+    @staticmethod
+    def _linea(bloque, candidato: str) -> str:
+        return json.dumps([bloque.id, bloque.timestamp, candidato, bloque.hash_actual], ensure_ascii=False) + "\n"
+
+    def reconstruir(self, bloques: Iterable) -> None:
+        """
+        Reconstruye el índice completo a partir de la cadena y reescribe el archivo.
+        Se usa cuando no hay índice, cuando no corresponde con la cadena o cuando
+        se modificó un bloque existente.
+        """
+        self._limpiar()
+        with open(self.filename, "w", encoding="utf-8") as f:
+            for b in bloques:
+                candidato = candidato_de(b.data)
+                if candidato is not None:
+                    self._insertar(b.id, b.timestamp, candidato)
+                    f.write(self._linea(b, candidato))
+                else:
+                    self.ultimo_id = max(self.ultimo_id, b.id)
+
+    def sincronizar(self, chain: List) -> None:
+        """
+        Carga el índice desde disco y lo pone al día con la cadena. Si el archivo falta,
+        está dañado o no corresponde con la cadena (el último voto indexado no existe o su
+        hash es distinto, por ejemplo porque chain.json se reemplazó por el de otro kiosco),
+        se reconstruye; si solo le faltan los últimos bloques, se indexan únicamente esos.
+        """
+        self._limpiar()
+        ultimo_hash = None
+        try:
+            with open(self.filename, "r", encoding="utf-8") as f:
+                for linea in f:
+                    id, ts, candidato, h = json.loads(linea)
+                    self._insertar(id, ts, candidato)
+                    if id == self.ultimo_id:
+                        ultimo_hash = h
+        except Exception:
+            self.reconstruir(chain)
+            return
+        # Los IDs son consecutivos desde el génesis, así que la posición es el ID
+        if self.ultimo_id >= 0 and (self.ultimo_id >= len(chain)
+                                    or chain[self.ultimo_id].hash_actual != ultimo_hash):
+            self.reconstruir(chain)
+            return
+        for b in chain[self.ultimo_id + 1:]:
+            self.agregar(b)
+
+    def _listas(self, candidato: Optional[str]) -> Tuple[List[str], List[int]]:
+        if candidato is None:
+            return self.timestamps, self.ids
+        return self.ts_candidato.get(candidato, []), self.ids_candidato.get(candidato, [])
+
+    @staticmethod
+    def _rango(ts_lista: List[str], desde: Optional[str], hasta: Optional[str]) -> Tuple[int, int]:
+        lo = bisect_left(ts_lista, desde) if desde is not None else 0
+        hi = bisect_left(ts_lista, hasta) if hasta is not None else len(ts_lista)
+        return lo, max(lo, hi)
+
+    def contar(self, desde: Optional[str] = None, hasta: Optional[str] = None,
+               candidato: Optional[str] = None) -> int:
+        ts_lista, _ = self._listas(candidato)
+        lo, hi = self._rango(ts_lista, desde, hasta)
+        return hi - lo
+
+    def ids_en_rango(self, desde: Optional[str] = None, hasta: Optional[str] = None,
+                     candidato: Optional[str] = None) -> List[int]:
+        ts_lista, id_lista = self._listas(candidato)
+        lo, hi = self._rango(ts_lista, desde, hasta)
+        return id_lista[lo:hi]
+
+    def por_intervalo(self, minutos: int = 60,
+                      candidato: Optional[str] = None) -> List[Tuple[str, int]]:
+        """
+        Agrupa los votos en intervalos consecutivos de `minutos`, desde el primer voto
+        hasta el último. Cada intervalo se cuenta con dos búsquedas binarias. Lanza
+        ValueError si `minutos` es menor que 1.
+        """
+        if minutos < 1:
+            raise ValueError("El intervalo debe ser de al menos 1 minuto.")
+        ts_lista, _ = self._listas(candidato)
+        if not self.timestamps:
+            return []
+        paso = timedelta(minutes=minutos)
+        inicio = datetime.fromisoformat(self.timestamps[0]).replace(minute=0, second=0, microsecond=0)
+        final = datetime.fromisoformat(self.timestamps[-1])
+        resultado = []
+        while inicio <= final:
+            siguiente = inicio + paso
+            lo, hi = self._rango(ts_lista, inicio.isoformat(), siguiente.isoformat())
+            resultado.append((inicio.isoformat(), hi - lo))
+            inicio = siguiente
+        return resultado
+
+    def candidatos(self) -> List[str]:
+        return sorted(self.ts_candidato)
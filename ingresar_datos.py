@@ -4,7 +4,6 @@ Estilo moderno con tarjeta central y validación de Blockchain.
 """
 import customtkinter as ctk
 from tkinter import messagebox
-import json
 
 class IngresarDatosFrame(ctk.CTkFrame):
     def __init__(self, parent, controller):
@@ -136,15 +135,7 @@ class IngresarDatosFrame(ctk.CTkFrame):
         already = False
         # Accedemos a la blockchain a través del controlador principal
         if hasattr(self.controller, 'bc') and self.controller.bc:
-            for b in self.controller.bc.chain:
-                try:
-                    payload = json.loads(b.data)
-                    # Verificamos si es un diccionario y si coincide el ID
-                    if isinstance(payload, dict) and payload.get("estudiante_id") == id_est:
-                        already = True
-                        break
-                except Exception:
-                    continue
+            already = self.controller.bc.ya_voto(id_est)
 
         if already:
             messagebox.showerror("Acceso Denegado", f"El código {id_est} ya ha registrado un voto en la Blockchain.")
@@ -0,0 +1,184 @@
+"""
+Herramienta: generador de carga para el backend de votación.
+Simula muchos kioscos concurrentes (un hilo por kiosco) que siguen el mismo camino que la
+interfaz: IngresarDatosFrame.on_submit revisa si el estudiante ya votó (ya_voto) y
+CandidatosFrame.submit_vote registra el voto (agregar_bloque). Al final recarga la cadena
+desde disco y reporta votos por segundo, latencias, votos perdidos o duplicados y la validez
+de la cadena.
+
+Uso:
+    python simulador_carga.py --kioscos 16 --votos 5000 [--repetidos 0.05] [--estaciones 4]
+"""
+import argparse
+import os
+import random
+import tempfile
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from blockchain import Blockchain
+from fragmentos import BlockchainFragmentada
+from votos import CANDIDATOS_DATA, codificar_voto, estudiante_id_de
+
+
+def _generar_votos(total: int, repetidos: float, semilla: int) -> List[Tuple[str, str]]:
+    """
+    Genera (id de estudiante, id de candidato) para cada intento de voto. Una fracción
+    `repetidos` reutiliza el código de un estudiante anterior; esos intentos deben rechazarse.
+    """
+    rnd = random.Random(semilla)
+    cand_ids = [c["id"] for c in CANDIDATOS_DATA]
+    votos = []
+    for i in range(total):
+        if votos and rnd.random() < repetidos:
+            est_id = rnd.choice(votos)[0]
+        else:
+            est_id = str(200000000 + i)
+        votos.append((est_id, rnd.choice(cand_ids)))
+    rnd.shuffle(votos)
+    return votos
+
+
+def _percentil(valores: List[float], p: float) -> float:
+    if not valores:
+        return 0.0
+    k = min(len(valores) - 1, int(round(p / 100 * (len(valores) - 1))))
+    return valores[k]
+
+
+def simular(kioscos: int, total: int, directorio: str, repetidos: float = 0.0,
+            estaciones: int = 0, semilla: int = 0) -> Dict[str, Any]:
+    """
+    Ejecuta la simulación y devuelve el reporte como diccionario. Con estaciones > 0 se usa
+    BlockchainFragmentada (los kioscos se reparten entre las estaciones); si no, todos los
+    kioscos comparten una sola Blockchain, como en la aplicación.
+    """
+    votos = _generar_votos(total, repetidos, semilla)
+    nombres = [f"est{i + 1}" for i in range(estaciones)]
+    if estaciones:
+        backend = BlockchainFragmentada(nombres, directorio)
+    else:
+        backend = Blockchain(os.path.join(directorio, "chain.json"))
+
+    latencias: List[List[float]] = [[] for _ in range(kioscos)]
+    aceptados: List[List[str]] = [[] for _ in range(kioscos)]
+    rechazados = [0] * kioscos
+    fallos: List[str] = []
+    inicio = threading.Barrier(kioscos + 1)
+
+    def kiosco(k: int) -> None:
+        estacion = nombres[k % estaciones] if estaciones else None
+        inicio.wait()
+        for est_id, cand_id in votos[k::kioscos]:
+            t0 = time.perf_counter()
+            try:
+                data = codificar_voto(cand_id, est_id, "Simulado", f"Kiosco {k}")
+                if estacion is not None:
+                    try:
+                        backend.registrar_voto(estacion, data)
+                    except ValueError:
+                        rechazados[k] += 1
+                        continue
+                elif backend.ya_voto(est_id):
+                    rechazados[k] += 1
+                    continue
+                else:
+                    backend.agregar_bloque(data)
+            except Exception as e:
+                fallos.append(f"Kiosco {k}: {e}")
+                continue
+            finally:
+                latencias[k].append(time.perf_counter() - t0)
+            aceptados[k].append(est_id)
+
+    hilos = [threading.Thread(target=kiosco, args=(k,), daemon=True) for k in range(kioscos)]
+    for h in hilos:
+        h.start()
+    inicio.wait()
+    t_inicio = time.perf_counter()
+    for h in hilos:
+        h.join()
+    duracion = time.perf_counter() - t_inicio
+    if estaciones:
+        backend.anclar()
+
+    # Recargar desde disco: lo que cuenta es lo que quedó persistido
+    if estaciones:
+        recargado = BlockchainFragmentada(nombres, directorio)
+        valido, errores = recargado.verificar()
+        cadenas = list(recargado.fragmentos.values())
+    else:
+        recargado = Blockchain(backend.filename)
+        valido, errores = recargado.verificar_cadena()
+        cadenas = [recargado]
+    en_cadena: Dict[str, int] = {}
+    for bc in cadenas:
+        for b in bc.chain:
+            est_id = estudiante_id_de(b.data)
+            if est_id is not None:
+                en_cadena[est_id] = en_cadena.get(est_id, 0) + 1
+
+    todos_aceptados = [e for lista in aceptados for e in lista]
+    todas_latencias = sorted(t for lista in latencias for t in lista)
+    esperados = len({e for e, _ in votos})
+    return {
+        "kioscos": kioscos,
+        "intentos": total,
+        "esperados": esperados,
+        "aceptados": len(todos_aceptados),
+        "rechazados": sum(rechazados),
+        "fallos": fallos,
+        "duracion": duracion,
+        "votos_por_segundo": len(todos_aceptados) / duracion if duracion else 0.0,
+        "latencia_p50": _percentil(todas_latencias, 50),
+        "latencia_p95": _percentil(todas_latencias, 95),
+        "latencia_p99": _percentil(todas_latencias, 99),
+        "latencia_max": todas_latencias[-1] if todas_latencias else 0.0,
+        # Aceptados por el backend pero ausentes de la cadena guardada
+        "perdidos": len(set(todos_aceptados) - set(en_cadena)),
+        # Estudiantes con más de un voto en la cadena guardada
+        "duplicados": sum(1 for n in en_cadena.values() if n > 1),
+        "cadena_valida": valido,
+        "errores_cadena": errores,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Simula kioscos concurrentes contra el backend de votación.")
+    parser.add_argument("--kioscos", type=int, default=8, help="kioscos simultáneos (hilos)")
+    parser.add_argument("--votos", type=int, default=1000, help="intentos de voto en total")
+    parser.add_argument("--repetidos", type=float, default=0.0,
+                        help="fracción de intentos con un código de estudiante ya usado")
+    parser.add_argument("--estaciones", type=int, default=0,
+                        help="usar cadenas por estación (BlockchainFragmentada) con N estaciones")
+    parser.add_argument("--directorio", help="dónde crear las cadenas (por defecto, un directorio temporal)")
+    parser.add_argument("--semilla", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    directorio = args.directorio or tempfile.mkdtemp(prefix="simulacion_")
+    os.makedirs(directorio, exist_ok=True)
+    rep = simular(args.kioscos, args.votos, directorio, args.repetidos, args.estaciones, args.semilla)
+
+    modo = f"{args.estaciones} estaciones" if args.estaciones else "cadena única"
+    print(f"Simulación: {rep['kioscos']} kioscos, {rep['intentos']} intentos, {modo} ({directorio})")
+    print(f"Duración: {rep['duracion']:.2f} s")
+    print(f"Votos aceptados: {rep['aceptados']} de {rep['esperados']} esperados "
+          f"({rep['rechazados']} rechazados por duplicado)")
+    print(f"Votos por segundo sostenidos: {rep['votos_por_segundo']:.1f}")
+    print("Latencia (ms): p50 {:.2f} | p95 {:.2f} | p99 {:.2f} | máx {:.2f}".format(
+        rep["latencia_p50"] * 1000, rep["latencia_p95"] * 1000,
+        rep["latencia_p99"] * 1000, rep["latencia_max"] * 1000))
+    print(f"Votos perdidos: {rep['perdidos']}")
+    print(f"Votantes duplicados en la cadena: {rep['duplicados']}")
+    print(f"Cadena válida: {'sí' if rep['cadena_valida'] else 'no'}")
+    for e in rep["errores_cadena"][:10]:
+        print(f"  {e}")
+    if rep["fallos"]:
+        print(f"Fallos del backend: {len(rep['fallos'])}")
+        for f in rep["fallos"][:10]:
+            print(f"  {f}")
+
+
+if __name__ == "__main__":
+    main()
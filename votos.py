@@ -0,0 +1,127 @@
+"""
+Codificación compacta de los votos que se guardan en el campo `data` de cada bloque.
+
+Formato v2 (campos posicionales separados por '|'):
+    v2|<id candidato>|<id estudiante>|<nombre>|<apellido>
+
+El candidato se referencia por su id de CANDIDATOS_DATA y las claves del JSON se
+sustituyen por la posición del campo. Los campos más consultados (candidato e id del
+estudiante) van primero para poder leerlos sin decodificar el resto del voto.
+Los votos antiguos (v1) son objetos JSON y se siguen leyendo sin cambios.
+"""
+import json
+from typing import Any, Dict, Optional
+
+# Datos de candidatos
+CANDIDATOS_DATA = [
+    {
+        "id": "cand_1",
+        "nombre": "Paquita la del Barrio",
+        "desc": "Propuesta centrada en la mejora tecnológica de las aulas y laboratorios, con enfoque en sostenibilidad ambiental dentro del campus.",
+        "img_file": "candidato_1.jpeg"
+    },
+    {
+        "id": "cand_2",
+        "nombre": "Vicente Fernández",
+        "desc": "Fomento a la cultura, el deporte y la integración de todas las carreras. Más becas y apoyos alimenticios para estudiantes.",
+        "img_file": "candidato_2.jpeg"
+    },
+    {
+        "id": "cand_3",
+        "nombre": "El Buki",
+        "desc": "Auditoría constante de recursos, creación de espacios de descanso y mejora en el sistema de transporte universitario.",
+        "img_file": "candidato_3.jpeg"
+    }
+]
+
+NOMBRE_POR_ID = {c["id"]: c["nombre"] for c in CANDIDATOS_DATA}
+
+VERSION = "v2"
+_PREFIJO = VERSION + "|"
+
+
+def _escapar(campo: str) -> str:
+    # '%' primero para que el escape sea reversible
+    return campo.replace("%", "%25").replace("|", "%7C")
+
+
+def _desescapar(campo: str) -> str:
+    return campo.replace("%7C", "|").replace("%25", "%")
+
+
+def codificar_voto(candidato_id: str, estudiante_id: str, nombre: str, apellido: str) -> str:
+    """
+    Genera el texto compacto de un voto. El resultado es determinista, por lo que el hash
+    del bloque depende únicamente de los datos del voto.
+    """
+    campos = (candidato_id, estudiante_id, nombre or "", apellido or "")
+    return _PREFIJO + "|".join(_escapar(c) for c in campos)
+
+
+def candidato_de(data: str) -> Optional[str]:
+    """
+    Devuelve el nombre del candidato de un bloque de voto, o None si el bloque no es un
+    voto. En v2 solo se separan los primeros campos; no se decodifica el resto.
+    """
+    if data.startswith(_PREFIJO):
+        cand_id = _desescapar(data.split("|", 2)[1])
+        return NOMBRE_POR_ID.get(cand_id, cand_id)
+    payload = _json_v1(data)
+    if payload is not None and payload.get("candidato"):
+        return payload["candidato"]
+    return None
+
+
+def estudiante_id_de(data: str) -> Optional[str]:
+    """
+    Devuelve el id del estudiante de un bloque de voto, o None si el bloque no es un voto.
+    """
+    if data.startswith(_PREFIJO):
+        partes = data.split("|", 3)
+        return _desescapar(partes[2]) if len(partes) > 2 else None
+    payload = _json_v1(data)
+    if payload is not None:
+        return payload.get("estudiante_id")
+    return None
+
+
+def mismo_estudiante(data: str, estudiante_id: str) -> bool:
+    """
+    Indica si el bloque es un voto del estudiante. Antes de decodificar descarta el bloque
+    con una búsqueda de subcadena del id tal como quedó guardado (escapado en v2, con el
+    escape de JSON en v1), así que la mayoría de los bloques no llegan a decodificarse.
+    """
+    if data.startswith(_PREFIJO):
+        guardado = _escapar(estudiante_id)
+    else:
+        guardado = json.dumps(estudiante_id, ensure_ascii=False)[1:-1]
+    return guardado in data and estudiante_id_de(data) == estudiante_id
+
+
+def decodificar_voto(data: str) -> Optional[Dict[str, Any]]:
+    """
+    Decodifica un voto completo (v1 o v2) al diccionario con las claves originales.
+    Devuelve None si los datos no corresponden a un voto.
+    """
+    if data.startswith(_PREFIJO):
+        partes = [_desescapar(p) for p in data.split("|")[1:]]
+        if len(partes) != 4:
+            return None
+        cand_id, estudiante_id, nombre, apellido = partes
+        return {
+            "estudiante_nombre": nombre,
+            "estudiante_apellido": apellido,
+            "estudiante_id": estudiante_id,
+            "candidato": NOMBRE_POR_ID.get(cand_id, cand_id),
+        }
+    return _json_v1(data)
+
+
+def _json_v1(data: str) -> Optional[Dict[str, Any]]:
+    if not data.startswith("{"):
+        return None
+    try:
+        payload = json.loads(data)
+    except Exception:
+        return None
+    return payload if isinstance(payload, dict) else None